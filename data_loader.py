@@ -1,19 +1,76 @@
 import tkinter as tk
 from tkinter import ttk
-from tkinter import filedialog, messagebox, scrolledtext
+from tkinter import filedialog, messagebox
 import pandas as pd
+import numpy as np
 import os
+import re
+import json
+import logging
+import logging.handlers
+import atexit
 import sqlite3
+import threading
+import queue
+import collections
+import importlib.util
+import functools
 from datetime import datetime
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
+# matplotlib is imported lazily by show_category_chart, so startup doesn't pay for it.
+# Figure is used directly (no pyplot), so charts never register with pyplot's global figure manager
+Figure = None
+FigureCanvasTkAgg = None
+
+# Status messages go to this logger; the app attaches a rotating file handler (log_file_path) when run as a script
+log = logging.getLogger("mf_loader")
+log.addHandler(logging.NullHandler())
 
 # --- Configuration ---
 default_excel_file_name = 'mutual_funds.xlsx'
 db_file_name = 'mf_data.db'
 table_name = 'mutual_funds'
+category_table_name = 'categories' # Sub_Category lookup; mutual_funds stores Sub_Category_Id
 script_dir = os.path.dirname(os.path.abspath(__file__))
 db_file_path = os.path.join(script_dir, db_file_name)
+cache_file_name = 'mf_cache.json' # Small JSON sidecar next to the DB (category list etc.)
+cache_file_path = os.path.join(script_dir, cache_file_name)
+log_file_path = os.path.join(script_dir, 'mf_loader.log') # Status history; rotated at 1MB, 3 backups kept
+TREE_PAGE_SIZE = 50 # Treeview rows inserted per page; more are added as the user scrolls down
+STATUS_FLUSH_MS = 33 # Status bar repaints at most ~30 times a second; only the newest pending message is shown
+INSERT_CHUNK_SIZE = 10000 # Rows per executemany batch when appending to SQLite
+EXCEL_CACHE_SIZE = 3 # Parsed workbooks kept in memory, keyed on path + mtime + size
+DEBUG = False # Echo every SQL query/params and column renames to the console
+USE_PANDAS_TO_SQL = False # Fallback append path: df.to_sql(method='multi') instead of executemany
+# Prefer the Rust-based calamine reader. If python-calamine isn't installed or pandas predates engine='calamine'
+# (added in 2.2), use None: .xlsx/.xlsm go through the openpyxl streaming reader, anything else (e.g. .xls via xlrd)
+# lets pandas pick the engine from the extension
+_pandas_version = tuple(int(part) for part in pd.__version__.split('.')[:2])
+EXCEL_ENGINE = 'calamine' if importlib.util.find_spec('python_calamine') and _pandas_version >= (2, 2) else None
+# Explicit dtypes for the known text columns (original headers). Numeric columns are left to inference and then
+# coerced via NUMERIC_COLUMNS, so one stray '-' cell becomes NaN instead of failing the whole load
+EXCEL_DTYPES = {'Name': str, 'Sub Category': str}
+
+# Runs of anything that isn't a letter/digit collapse to a single '_' when cleaning column names
+_COLCLEAN = re.compile(r'[^A-Za-z0-9]+')
+# Pre-cleaned names for the columns the app queries; only headers missing here go through _COLCLEAN
+KNOWN_COLUMN_MAP = {
+    "Name": "Name", "Sub Category": "Sub_Category", "AUM": "AUM", "NAV": "NAV",
+    "Expense Ratio": "Expense_Ratio", "CAGR 3Y": "CAGR_3Y", "CAGR 5Y": "CAGR_5Y",
+    "Absolute Returns - 1Y": "Absolute_Returns_1Y", "Sharpe Ratio": "Sharpe_Ratio", "Alpha": "Alpha",
+}
+# Cleaned names of the only columns read from Excel; everything else in the workbook is skipped at parse time
+NEEDED_COLUMNS = frozenset(KNOWN_COLUMN_MAP.values())
+NUMERIC_COLUMNS = NEEDED_COLUMNS - {'Name', 'Sub_Category'} # Stored as REAL
+
+def _clean_column_name(col):
+    """ Maps an Excel header to its SQL-safe column name. """
+    return KNOWN_COLUMN_MAP.get(col) or _COLCLEAN.sub('_', str(col)).strip('_')
+
+def _is_needed_column(col):
+    """ usecols callable: matches on the cleaned name, so header spelling/spacing variants still load. """
+    return _clean_column_name(col) in NEEDED_COLUMNS
 
 # --- Mapping for Ranking Criteria ---
 RANKING_OPTIONS = {
@@ -26,6 +83,43 @@ RANKING_OPTIONS = {
     "Largest AUM": ("AUM", "DESC"),
 }
 
+# Rankings that get a covering index (Date_Loaded, ranking col, every displayed column); the rest get a plain
+# (Date_Loaded, ranking col) index. Each covering index roughly duplicates the displayed data on disk, so keep this short
+COVERING_RANKINGS = ('CAGR_3Y', 'CAGR_5Y')
+# mutual_funds columns read by the ranking query; filter columns first so the index can also narrow on them
+RANKED_DISPLAY_COLUMNS = ('Sub_Category_Id', 'AUM', 'Expense_Ratio', 'Name', 'NAV', 'CAGR_3Y', 'CAGR_5Y',
+                          'Absolute_Returns_1Y', 'Sharpe_Ratio', 'Alpha')
+
+# --- Treeview columns: fixed order shown by the ranking query, set up once by _init_tree_columns ---
+DISPLAY_COLUMNS = ('Name', 'Sub_Category', 'AUM', 'NAV', 'Expense_Ratio', 'CAGR_3Y', 'CAGR_5Y',
+                   'Absolute_Returns_1Y', 'Sharpe_Ratio', 'Alpha', 'Date_Loaded')
+# Cleaned column name -> (width, anchor, heading)
+COLUMN_STYLE = {
+    "Name": (250, 'w', "Name"), "Sub_Category": (150, 'w', "Sub Category"), "Date_Loaded": (130, 'center', "Date Loaded"),
+    "AUM": (100, 'e', "AUM"), "NAV": (100, 'e', "NAV"), "Expense_Ratio": (80, 'e', "Expense Ratio"),
+    "CAGR_3Y": (80, 'e', "CAGR 3Y"), "CAGR_5Y": (80, 'e', "CAGR 5Y"), "Absolute_Returns_1Y": (80, 'e', "Absolute Returns 1Y"),
+    "Sharpe_Ratio": (80, 'e', "Sharpe Ratio"), "Alpha": (80, 'e', "Alpha"),
+}
+
+# --- Fixed SQL, formatted once at import (the ranking query is built per filter shape by _build_query) ---
+_LATEST_SQL = f"SELECT MAX(Date_Loaded) FROM {table_name}"
+# Latest timestamp and its category counts in one round trip
+_CHART_SQL = f"""
+    WITH latest AS (SELECT MAX(Date_Loaded) AS d FROM {table_name})
+    SELECT latest.d AS Latest, c.name AS Sub_Category, COUNT(*) as Count
+    FROM {table_name} mf JOIN latest ON mf.Date_Loaded = latest.d
+    LEFT JOIN {category_table_name} c ON c.id = mf.Sub_Category_Id
+    GROUP BY mf.Sub_Category_Id ORDER BY Count DESC LIMIT 15 """
+# Same counts for an already-known latest timestamp (skips the MAX lookup)
+_CHART_AT_SQL = f"""
+    SELECT mf.Date_Loaded AS Latest, c.name AS Sub_Category, COUNT(*) as Count
+    FROM {table_name} mf LEFT JOIN {category_table_name} c ON c.id = mf.Sub_Category_Id
+    WHERE mf.Date_Loaded = ?
+    GROUP BY mf.Sub_Category_Id ORDER BY Count DESC LIMIT 15 """
+_CATEGORIES_SQL = f""" SELECT DISTINCT c.name AS Sub_Category FROM {table_name} mf
+                        JOIN {category_table_name} c ON c.id = mf.Sub_Category_Id
+                        WHERE mf.Date_Loaded = ? ORDER BY c.name """
+
 # --- CORE DATA FUNCTIONS (Paste latest working versions here) ---
 # --- [Paste load_mutual_fund_data_from_excel here] ---
 # --- [Paste save_data_to_sqlite here] ---
@@ -35,117 +129,404 @@ RANKING_OPTIONS = {
 # Placeholder functions if needed - REPLACE these with your actual working functions
 # --- CORE DATA FUNCTIONS ---
 
-def load_mutual_fund_data_from_excel(file_path):
-    """ Loads data from Excel, cleans column names, and adds a timestamp. """
+def _read_excel_stream(file_path, offset=None, nrows=None):
+    """ Streams the first sheet with openpyxl's read-only mode straight into a DataFrame (no per-cell pandas conversion). """
+    import openpyxl # Only needed when calamine isn't available
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        header = next(ws.iter_rows(max_row=1, values_only=True), None)
+        if header is None: return pd.DataFrame()
+        first_row = 2 + (offset or 0) # Row 1 is the header; skipped rows are never turned into cells
+        last_row = first_row + nrows - 1 if nrows is not None else None
+        columns = [h if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+        keep = [i for i, col in enumerate(columns) if _is_needed_column(col)]
+        if not keep: return pd.DataFrame()
+        # Accumulate column-wise: one list per kept column instead of a tuple per row, so no row objects are held
+        data = [[] for _ in keep]
+        appenders = [(i, values.append) for i, values in zip(keep, data)]
+        for row in ws.iter_rows(min_row=first_row, max_row=last_row, values_only=True):
+            if all(v is None for v in row): continue # Skip blank rows like read_excel does
+            width = len(row)
+            for i, append in appenders: append(row[i] if i < width else None)
+    finally:
+        wb.close()
+    df = pd.DataFrame(dict(enumerate(data))) # Positional keys keep duplicate headers apart
+    df.columns = [columns[i] for i in keep]
+    return df
+
+_excel_cache = {} # (abs path, mtime_ns, size, offset, nrows) -> cleaned DataFrame, oldest first
+
+def load_mutual_fund_data_from_excel(file_path, offset=None, nrows=None):
+    """ Loads data from Excel, cleans column names, and adds a timestamp.
+        offset/nrows optionally restrict the read to data rows [offset, offset+nrows) (header is always kept). """
     status_update(f"Attempting to load data from Excel: {os.path.basename(file_path)}")
     try:
         if not os.path.exists(file_path):
-            messagebox.showerror("Error", f"Excel file not found at {file_path}")
+            run_on_ui(messagebox.showerror, "Error", f"Excel file not found at {file_path}")
             status_update("Error: Excel file not found.")
             return None
-        df = pd.read_excel(file_path)
-        status_update(f"Successfully loaded {len(df)} rows from Excel!")
-        # Clean column names for SQL compatibility
-        original_columns = list(df.columns)
-        df.columns = df.columns.str.replace(r'[^A-Za-z0-9_]+', '_', regex=True).str.replace(r'_+', '_', regex=True).str.strip('_')
-        cleaned_columns = list(df.columns)
-        if original_columns != cleaned_columns:
-             print("Column name changes:")
-             for orig, clean in zip(original_columns, cleaned_columns):
-                  if orig != clean: print(f"  '{orig}' -> '{clean}'")
-        status_update("Cleaned column names.")
+        file_stat = os.stat(file_path)
+        cache_key = (os.path.abspath(file_path), file_stat.st_mtime_ns, file_stat.st_size, offset, nrows)
+        if cache_key in _excel_cache: # Same file, unchanged since it was last parsed
+            df = _excel_cache[cache_key].copy() # Copy so Date_Loaded etc. never leak into the cache
+            status_update(f"Excel file unchanged; reusing {len(df)} parsed rows.")
+        else:
+            engine = EXCEL_ENGINE or 'auto'
+            if EXCEL_ENGINE is None and file_path.lower().endswith(('.xlsx', '.xlsm')):
+                df = _read_excel_stream(file_path, offset=offset, nrows=nrows); engine = 'openpyxl'
+            else:
+                skiprows = range(1, offset + 1) if offset else None # Keep the header row
+                df = pd.read_excel(file_path, engine=EXCEL_ENGINE, usecols=_is_needed_column, dtype=EXCEL_DTYPES, skiprows=skiprows, nrows=nrows)
+            status_update(f"Successfully loaded {len(df)} rows from Excel! (engine: {engine})")
+            # Clean column names for SQL compatibility
+            original_columns = list(df.columns)
+            df.columns = [_clean_column_name(col) for col in df.columns]
+            cleaned_columns = list(df.columns)
+            if DEBUG and original_columns != cleaned_columns:
+                 print("Column name changes:")
+                 for orig, clean in zip(original_columns, cleaned_columns):
+                      if orig != clean: print(f"  '{orig}' -> '{clean}'")
+            status_update("Cleaned column names.")
+            # Numeric metrics as float64 (readers hand back object columns when a cell isn't numeric); junk cells -> NaN -> NULL
+            for col in NUMERIC_COLUMNS.intersection(df.columns):
+                if not pd.api.types.is_float_dtype(df[col]):
+                    df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+            _excel_cache[cache_key] = df.copy()
+            while len(_excel_cache) > EXCEL_CACHE_SIZE:
+                del _excel_cache[next(iter(_excel_cache))] # Evict the oldest parse
         # Add 'Date_Loaded' column
         load_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        df['Date_Loaded'] = load_time
+        # One shared string behind int8 codes instead of a pointer per row; kept as TEXT so SQL comparisons are unchanged
+        df['Date_Loaded'] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[load_time])
         status_update(f"Added 'Date_Loaded' column: {load_time}")
         return df
     except Exception as e:
-        messagebox.showerror("Error", f"An error occurred loading Excel:\n{e}")
+        run_on_ui(messagebox.showerror, "Error", f"An error occurred loading Excel:\n{e}")
         status_update(f"Error loading Excel: {e}")
         return None
 
+# --- Persistent SQLite connections (opened lazily, closed on app exit) ---
+# One write connection (load worker, schema changes) and one read connection (Tk-thread queries, category worker).
+# Under WAL, readers keep seeing the last committed load while an append is in progress instead of waiting for it
+_connections = {} # (db_path, 'read' | 'write') -> sqlite3.Connection
+_write_lock = threading.RLock() # Serializes use of the write connection
+_read_lock = threading.RLock() # Serializes use of the read connection
+
+# Applied to every connection in one executescript call
+_CONN_PRAGMAS = """
+    -- 8KB pages: fewer pages per ranking scan. Only takes effect for a new (empty) DB, so it must precede the WAL
+    -- switch; an existing DB keeps its page size until converted offline (journal_mode=DELETE, page_size, VACUUM)
+    PRAGMA page_size=8192;
+    PRAGMA journal_mode=WAL;        -- Persistent: stored in the DB file once set
+    PRAGMA synchronous=NORMAL;      -- With WAL, fsync only at checkpoints, not every commit
+    PRAGMA cache_size=-65536;       -- ~64MB page cache, kept warm between queries
+    PRAGMA mmap_size=268435456;     -- Read pages straight from the OS cache (256MB window)
+    PRAGMA temp_store=MEMORY;       -- Sorts/GROUP BY temp b-trees stay in RAM
+"""
+
+def _configure_conn(conn):
+    """ Applies the per-connection PRAGMAs (journal mode, fsync policy, cache sizes). """
+    conn.executescript(_CONN_PRAGMAS)
+
+def _get_conn(db_path, role='read'):
+    """ Returns the long-lived read or write connection for db_path, opening and configuring it on first use.
+        Callers hold the matching lock (_read_lock / _write_lock). """
+    conn = _connections.get((db_path, role))
+    if conn is None:
+        # Autocommit (writes issue BEGIN/COMMIT themselves); shared across threads under its lock
+        conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        try:
+            _configure_conn(conn)
+            if role == 'read': conn.execute("PRAGMA query_only=ON") # Guard: writes must go through the write connection
+        except Exception:
+            conn.close(); raise # Not cached, so the next call opens and configures a fresh connection
+        _connections[(db_path, role)] = conn
+    return conn
+
+def init_db(db_path):
+    """ Opens the persistent connections at startup so the PRAGMAs and schema/index checks run before the first click.
+        Failures (DB locked, read-only, failed migration) are reported, not raised; the lazy paths retry on first use. """
+    try:
+        _check_schema_once(db_path)
+        with _read_lock: _get_conn(db_path, 'read')
+    except Exception as e:
+        status_update(f"Database not ready: {e}")
+        run_on_ui(messagebox.showwarning, "Database Warning", f"Could not open the database at startup:\n{e}\n\nIt will be retried on first use.")
+
+def close_db_connections():
+    """ Closes every cached SQLite connection. Called on app shutdown.
+        Takes both locks, so it waits for an in-flight append/query instead of closing the connection under it. """
+    with _write_lock, _read_lock:
+        for conn in _connections.values():
+            try: conn.close()
+            except Exception as e: print(f"Error closing DB connection: {e}")
+        _connections.clear()
+
+atexit.register(close_db_connections) # The only close path: runs after the executor has joined its workers (app close, Ctrl+C, sys.exit)
+
+_schema_checked = set() # DB paths whose indexes were already verified this session
+
+def _check_schema_once(db_path):
+    """ Runs _ensure_schema on the write connection the first time db_path is used with an existing table. """
+    if db_path in _schema_checked: return
+    with _write_lock:
+        if _ensure_schema(_get_conn(db_path, 'write'), table_name): _schema_checked.add(db_path)
+
+def _check_schema_for_read(db_path):
+    """ Read-path variant of _check_schema_once that never waits on _write_lock (so never on a running append).
+        A missing table is left to save_data_to_sqlite; a held write lock means a load is running, which migrates itself. """
+    if db_path in _schema_checked: return
+    with _read_lock:
+        if not _table_exists(_get_conn(db_path, 'read'), table_name): return
+    if _write_lock.acquire(blocking=False):
+        try: _check_schema_once(db_path)
+        finally: _write_lock.release()
+
+def _table_exists(conn, tbl_name):
+    """ True if tbl_name exists in the DB behind conn. """
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (tbl_name,)).fetchone() is not None
+
+def _ensure_schema(conn, tbl_name):
+    """ Idempotently creates the category lookup table, migrates old tables and creates the read-query indexes. """
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {category_table_name} (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    if not _table_exists(conn, tbl_name):
+        return False
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({tbl_name})")}
+    if 'Sub_Category_Id' not in columns:
+        # Table from before the category lookup existed: add the FK column and backfill it from the text column
+        conn.execute("BEGIN")
+        try:
+            conn.execute(f"ALTER TABLE {tbl_name} ADD COLUMN Sub_Category_Id INTEGER")
+            if 'Sub_Category' in columns:
+                conn.execute(f"""INSERT OR IGNORE INTO {category_table_name} (name)
+                                 SELECT DISTINCT Sub_Category FROM {tbl_name} WHERE Sub_Category IS NOT NULL""")
+                conn.execute(f"""UPDATE {tbl_name} SET Sub_Category_Id =
+                                 (SELECT id FROM {category_table_name} WHERE name = {tbl_name}.Sub_Category)""")
+            conn.execute("DROP INDEX IF EXISTS idx_ts_cat") # Superseded by idx_ts_catid
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction: conn.execute("ROLLBACK") # Leave the connection usable; the next call retries
+            raise
+    # Leading Date_Loaded serves MAX(Date_Loaded) and '= ?' lookups; Sub_Category_Id covers the filter/group-by
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_ts_catid ON {tbl_name}(Date_Loaded, Sub_Category_Id)")
+    return True
+
+def post_load_index(conn, tbl_name):
+    """ Builds a (Date_Loaded, ranking column) index per RANKING_OPTIONS entry after a bulk append, then refreshes planner stats. """
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({tbl_name})")}
+    for ranking_col, sort_order in RANKING_OPTIONS.values():
+        if ranking_col not in columns: continue # Workbooks without this metric just don't get the index
+        index_name = f"idx_date_{ranking_col.lower()}"
+        extra = [col for col in RANKED_DISPLAY_COLUMNS if col != ranking_col]
+        if ranking_col in COVERING_RANKINGS and all(col in columns for col in extra):
+            # Index-only top 100: the ranked rows are read straight from the index, never from the table
+            conn.execute(f"DROP INDEX IF EXISTS {index_name}") # Superseded by the covering one
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name}_cover ON {tbl_name}(Date_Loaded, {ranking_col} {sort_order}, {', '.join(extra)})")
+        else:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {tbl_name}(Date_Loaded, {ranking_col} {sort_order})")
+    conn.execute(f"ANALYZE {tbl_name}")
+
+def _normalize_categories(conn, df):
+    """ Replaces the repeated Sub_Category text with an integer Sub_Category_Id into the category lookup table. """
+    if 'Sub_Category' not in df.columns:
+        return df
+    sub_categories = df['Sub_Category'].astype('category') # Low cardinality: only the unique names touch SQLite
+    names = [str(name) for name in sub_categories.cat.categories]
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {category_table_name} (id INTEGER PRIMARY KEY, name TEXT UNIQUE)")
+    conn.executemany(f"INSERT OR IGNORE INTO {category_table_name} (name) VALUES (?)", ((name,) for name in names))
+    name_to_id = dict(conn.execute(f"SELECT name, id FROM {category_table_name}").fetchall())
+    category_ids = [name_to_id[name] for name in names]
+    df = df.drop(columns='Sub_Category')
+    df['Sub_Category_Id'] = [category_ids[code] if code >= 0 else None for code in sub_categories.cat.codes]
+    return df
+
 def save_data_to_sqlite(df, db_path, tbl_name):
-    """ Saves the DataFrame to SQLite, APPENDING data. """
+    """ Saves the DataFrame to SQLite, APPENDING data in a single explicit transaction. """
+    global _latest_ts
     if df is None or df.empty:
         status_update("No data provided to save.")
         return False
     status_update(f"Appending {len(df)} rows to SQLite table '{tbl_name}'...")
     conn = None
-    try:
-        conn = sqlite3.connect(db_path)
-        df.to_sql(tbl_name, conn, if_exists='append', index=False)
-        conn.commit() # Ensure data is saved
-        conn.close()
+    with _write_lock: # Readers use their own connection and see the previous load until COMMIT
+        try:
+            conn = _get_conn(db_path, 'write')
+            df = _normalize_categories(conn, df)
+            # Let pandas create the table schema on first run (no rows are written here)
+            df.head(0).to_sql(tbl_name, conn, if_exists='append', index=False, dtype={'Sub_Category_Id': 'INTEGER'})
+            if _ensure_schema(conn, tbl_name): _schema_checked.add(db_path) # Migrates tables created before Sub_Category_Id existed
+            conn.execute("BEGIN") # The whole append is one transaction (one commit/fsync) on either path
+            if USE_PANDAS_TO_SQL:
+                # Multi-row INSERT ... VALUES (...),(...) batches sized to stay under SQLite's 999-variable limit
+                df.to_sql(tbl_name, conn, if_exists='append', index=False, method='multi', chunksize=max(1, 900 // len(df.columns)))
+            else:
+                column_list = ", ".join(f'"{col}"' for col in df.columns)
+                placeholders = ",".join("?" * len(df.columns))
+                insert_sql = f"INSERT INTO {tbl_name} ({column_list}) VALUES ({placeholders})"
+                rows = df.itertuples(index=False, name=None) # One lazy pass; no per-chunk DataFrame slices
+                while batch := list(islice(rows, INSERT_CHUNK_SIZE)):
+                    conn.executemany(insert_sql, batch)
+            if conn.in_transaction: conn.execute("COMMIT") # to_sql commits the open transaction itself
+            if 'Date_Loaded' in df.columns:
+                _latest_ts = df['Date_Loaded'].iloc[0] # We just wrote the newest load; no MAX() needed
+        except Exception as e:
+            run_on_ui(messagebox.showerror, "Error", f"An error occurred saving to database:\n{e}")
+            status_update(f"Error saving/appending to DB: {e}")
+            if conn:
+                conn.rollback() # Rollback changes on error
+            return False
         status_update(f"Successfully appended data to table '{tbl_name}'.")
+        # The rows are committed from here on: an index/ANALYZE failure is only a warning, not a failed append
+        try: post_load_index(conn, tbl_name) # Built after the insert so it doesn't slow the append itself
+        except Exception as e: status_update(f"Warning: data appended, but index/ANALYZE refresh failed: {e}")
         return True
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred saving to database:\n{e}")
-        status_update(f"Error saving/appending to DB: {e}")
-        if conn:
-            conn.rollback() # Rollback changes on error
-            conn.close()
-        return False
 
 def query_data_from_sqlite(db_path, query, params=None):
     """ Generic function to query data from SQLite. Returns DataFrame or None on error. """
     # Note: Removed table_name argument as it's part of the query string
-    conn = None
     df_from_db = None
     try:
         if not os.path.exists(db_path):
              status_update("Error: Database file not found.")
              return None
-        conn = sqlite3.connect(db_path)
-        print(f"Executing query: {query}") # Keep console log
-        if params:
-            print(f"With parameters: {params}")
-            df_from_db = pd.read_sql_query(query, conn, params=params)
-        else:
-            df_from_db = pd.read_sql_query(query, conn)
-        conn.close()
+        _check_schema_for_read(db_path)
+        with _read_lock:
+            conn = _get_conn(db_path, 'read')
+            if DEBUG: print(f"Executing query: {query}\nWith parameters: {params}")
+            if params:
+                df_from_db = pd.read_sql_query(query, conn, params=params)
+            else:
+                df_from_db = pd.read_sql_query(query, conn)
         return df_from_db
     except Exception as e:
         print(f"Error querying DB: {e}")
         status_update(f"Error querying DB: {e}")
-        if conn: conn.close()
         return None # Ensure None is returned on error
 
+def iter_query_rows(db_path, query, params=None, chunksize=TREE_PAGE_SIZE):
+    """ Generator: runs a query on the read connection and yields its rows in lists of up to chunksize.
+        Holds _read_lock until exhausted, so consume it promptly (off the Tk thread). Errors propagate to the caller. """
+    _check_schema_for_read(db_path)
+    with _read_lock:
+        conn = _get_conn(db_path, 'read')
+        if DEBUG: print(f"Executing query: {query}\nWith parameters: {params}")
+        cur = conn.execute(query, params or ())
+        try:
+            while rows := cur.fetchmany(chunksize):
+                yield rows
+        finally:
+            cur.close() # Ends the read snapshot even if the caller stops early
+
+# --- JSON sidecar cache (survives restarts; each entry records what it was computed from) ---
+
+def _load_sidecar():
+    """ Returns the sidecar cache as a dict ({} if it is missing or unreadable). """
+    try:
+        with open(cache_file_path, encoding='utf-8') as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def _save_sidecar(key, value):
+    """ Updates one top-level entry of the sidecar cache (written atomically via a temp file). """
+    data = _load_sidecar(); data[key] = value
+    tmp_path = cache_file_path + '.tmp'
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f: json.dump(data, f)
+        os.replace(tmp_path, cache_file_path)
+    except OSError as e: print(f"Error writing cache file: {e}")
+
+# --- Cached latest load timestamp (set by save_data_to_sqlite after every successful append) ---
+_latest_ts = None
+
+def get_latest_timestamp(refresh=False):
+    """ Returns the latest Date_Loaded value, only querying the DB when the cache is empty (or refresh=True). """
+    global _latest_ts
+    if _latest_ts is None or refresh:
+        df_latest_date = query_data_from_sqlite(db_path=db_file_path, query=_LATEST_SQL)
+        if df_latest_date is not None and not df_latest_date.empty and pd.notna(df_latest_date.iloc[0,0]):
+            _latest_ts = df_latest_date.iloc[0,0]
+    return _latest_ts
+
+# --- Cached chart window (reused across clicks; bars/title are blitted on refresh) ---
+_chart_state = {'window': None, 'fig': None, 'ax': None, 'canvas': None,
+                'bars': None, 'title': None, 'categories': None, 'bg': None}
+
+def _on_chart_draw(event):
+    """ After every full redraw (first show, resize), caches the static background and paints the animated artists. """
+    state = _chart_state
+    if state['bars'] is None: return
+    state['bg'] = state['canvas'].copy_from_bbox(state['fig'].bbox)
+    for artist in (*state['bars'], state['title']):
+        state['fig'].draw_artist(artist)
+
+def _blit_chart(counts, title):
+    """ Updates bar heights and title in place and blits them. Returns False if a full redraw is needed instead. """
+    state = _chart_state
+    if state['bg'] is None or max(counts) > state['ax'].get_ylim()[1]:
+        return False
+    for bar, count in zip(state['bars'], counts): bar.set_height(count)
+    state['title'].set_text(title)
+    state['canvas'].restore_region(state['bg'])
+    for artist in (*state['bars'], state['title']):
+        state['fig'].draw_artist(artist)
+    state['canvas'].blit(state['fig'].bbox)
+    return True
+
+def _on_chart_close():
+    """ Destroys the chart window and forgets the cached figure so the next click rebuilds it. """
+    window, fig, canvas = _chart_state['window'], _chart_state['fig'], _chart_state['canvas']
+    for key in _chart_state: _chart_state[key] = None
+    fig.clf() # Drop the artists now rather than waiting for the GC
+    canvas.get_tk_widget().destroy()
+    window.destroy()
+
 def show_category_chart():
     """ Queries category counts for the LATEST data and displays a bar chart. """
+    global Figure, FigureCanvasTkAgg, _latest_ts
     status_update("Generating category chart...")
-    # 1. Find latest timestamp
-    latest_date_query = f"SELECT MAX(Date_Loaded) FROM {table_name}"
-    df_latest_date = query_data_from_sqlite(db_path=db_file_path, query=latest_date_query) # Use corrected call signature
-    if df_latest_date is None or df_latest_date.empty or pd.isna(df_latest_date.iloc[0,0]):
-         messagebox.showerror("Error", "Could not determine the latest data load time.")
-         status_update("Error: Cannot find latest load time for chart.")
-         return
-    latest_timestamp = df_latest_date.iloc[0,0]
-    status_update(f"Latest data timestamp for chart: {latest_timestamp}")
-    # 2. Query category counts for that timestamp
-    chart_query = f"""
-        SELECT Sub_Category, COUNT(*) as Count
-        FROM {table_name} WHERE Date_Loaded = ?
-        GROUP BY Sub_Category ORDER BY Count DESC LIMIT 15 """
-    df_chart = query_data_from_sqlite(db_path=db_file_path, query=chart_query, params=(latest_timestamp,)) # Use corrected call signature
+    # 1. Category counts for the latest load: cached timestamp if we have one, else MAX() in the same query
+    if _latest_ts is not None:
+        df_chart = query_data_from_sqlite(db_path=db_file_path, query=_CHART_AT_SQL, params=(_latest_ts,))
+    else:
+        df_chart = query_data_from_sqlite(db_path=db_file_path, query=_CHART_SQL)
     if df_chart is None:
          status_update("Could not query chart data."); return
     if df_chart.empty:
         messagebox.showinfo("Info", "No category data found for the latest timestamp.")
         status_update("No category data found for chart."); return
-    status_update("Chart data queried successfully.")
-    # 3. Create and display plot
+    latest_timestamp = _latest_ts = df_chart['Latest'].iloc[0] # Seeds the cache on the MAX() path
+    status_update(f"Chart data queried successfully (as of {latest_timestamp}).")
+    categories = df_chart['Sub_Category'].tolist(); counts = df_chart['Count'].tolist()
+    title = f'Top 15 Fund Categories by Count (as of {latest_timestamp})'
+    # 3. Create and display plot (reusing the open chart window if there is one)
     try:
-        fig, ax = plt.subplots(figsize=(10, 6))
-        ax.bar(df_chart['Sub_Category'], df_chart['Count'])
+        if Figure is None: # First chart of the session: load matplotlib + Tk backend now
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        state = _chart_state
+        if state['window'] is not None and state['categories'] == categories and _blit_chart(counts, title):
+            state['window'].lift()
+            status_update("Chart refreshed."); return
+        if state['window'] is None:
+            fig = Figure(figsize=(10, 6)); ax = fig.add_subplot(111)
+            # Fixed margins (room for 90-degree category labels) instead of a tight_layout text-measuring pass per redraw
+            fig.subplots_adjust(bottom=0.35, left=0.08, right=0.98, top=0.92)
+            chart_window = tk.Toplevel(root)
+            chart_window.title("Fund Category Chart"); chart_window.geometry("800x600")
+            chart_window.protocol("WM_DELETE_WINDOW", _on_chart_close)
+            canvas = FigureCanvasTkAgg(fig, master=chart_window)
+            canvas_widget = canvas.get_tk_widget(); canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
+            canvas.mpl_connect('draw_event', _on_chart_draw)
+            state.update(window=chart_window, fig=fig, ax=ax, canvas=canvas)
+        ax = state['ax']; ax.clear()
+        # Bars and title are animated: full draws skip them so the cached background stays bar-free
+        state['bars'] = list(ax.bar(categories, counts, animated=True))
         ax.set_xlabel('Sub Category'); ax.set_ylabel('Number of Funds')
-        ax.set_title(f'Top 15 Fund Categories by Count (as of {latest_timestamp})')
-        plt.xticks(rotation=90); plt.tight_layout()
-        chart_window = tk.Toplevel(root)
-        chart_window.title("Fund Category Chart"); chart_window.geometry("800x600")
-        canvas = FigureCanvasTkAgg(fig, master=chart_window)
-        canvas_widget = canvas.get_tk_widget(); canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
-        canvas.draw()
+        state['title'] = ax.set_title(title, animated=True)
+        ax.tick_params(axis='x', labelrotation=90)
+        state['categories'] = categories; state['bg'] = None # Old background is stale until the redraw below runs
+        state['canvas'].draw_idle() # Redraws once Tk is idle; fires _on_chart_draw, which caches the background and paints the bars
+        state['window'].lift()
         status_update("Chart displayed.")
     except Exception as e:
         messagebox.showerror("Chart Error", f"Could not generate or display chart:\n{e}")
@@ -157,6 +538,27 @@ def show_category_chart():
 
 # --- GUI HELPER FUNCTIONS ---
 
+# Worker threads must not touch Tk directly; they post callbacks here for the Tk thread to run
+_ui_queue = queue.Queue()
+# Background work (Excel load + append, category query); results come back to the Tk thread via run_on_ui
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="mf_worker")
+
+def run_on_ui(func, *args):
+    """ Runs func(*args) on the Tk thread: right away if already on it, otherwise via _ui_queue. """
+    if threading.current_thread() is threading.main_thread():
+        func(*args)
+    else:
+        _ui_queue.put((func, args))
+
+def _process_ui_queue():
+    """ Drains callbacks posted by worker threads, then re-arms itself on the Tk event loop. """
+    while True:
+        try: func, args = _ui_queue.get_nowait()
+        except queue.Empty: break
+        try: func(*args)
+        except Exception as e: print(f"Error in UI callback: {e}")
+    root.after(50, _process_ui_queue)
+
 def browse_excel_file():
     file_path = filedialog.askopenfilename(title="Select Excel File", filetypes=[("Excel files", "*.xlsx *.xls")])
     if file_path: excel_path_var.set(file_path); status_update(f"Selected: {os.path.basename(file_path)}")
@@ -165,14 +567,48 @@ def process_data():
     excel_file = excel_path_var.get()
     if not excel_file: messagebox.showwarning("Missing Input", "Select Excel file."); return
     clear_treeview()
+    load_button.config(state='disabled') # One load at a time
+    _executor.submit(_load_worker, excel_file).add_done_callback(_on_load_future_done)
+
+def _load_worker(excel_file):
+    """ Runs the Excel load + DB append off the Tk thread. Returns the save result (None = Excel load failed). """
     df = load_mutual_fund_data_from_excel(excel_file)
-    if df is not None:
-        save_successful = save_data_to_sqlite(df, db_file_path, table_name)
-        if save_successful:
-            status_update("Pipeline Complete: Load & Append successful!"); messagebox.showinfo("Success", "Data loaded & appended!")
-            populate_category_filter()
-        else: status_update("Pipeline Failed: Could not append.")
-    else: status_update("Pipeline Failed: Could not load.")
+    return save_data_to_sqlite(df, db_file_path, table_name) if df is not None else None
+
+def _on_load_future_done(future):
+    """ Done-callback for _load_worker (runs on the worker thread); hands the result to the Tk thread. """
+    try: save_successful = future.result()
+    except Exception as e: # Unexpected error outside the load/save handlers
+        status_update(f"Error in load worker: {e}"); save_successful = None
+    run_on_ui(_on_load_done, save_successful)
+
+def _on_load_done(save_successful):
+    """ Tk-thread completion handler for _load_worker (None = Excel load failed). """
+    load_button.config(state='normal')
+    if save_successful:
+        status_update("Pipeline Complete: Load & Append successful!"); messagebox.showinfo("Success", "Data loaded & appended!")
+        populate_category_filter()
+    elif save_successful is None: status_update("Pipeline Failed: Could not load.")
+    else: status_update("Pipeline Failed: Could not append.")
+
+def _parse_float_or_none(var):
+    """ Reads a filter Entry's StringVar: blank -> None, otherwise float (raises ValueError on junk). """
+    text = var.get().strip()
+    return float(text) if text else None
+
+@functools.lru_cache(maxsize=64)
+def _build_query(flags):
+    """ Returns the ranking SQL for a filter shape. Identical strings let sqlite3's statement cache reuse the compiled plan. """
+    has_category, has_min_aum, has_max_aum, has_min_exp, has_max_exp, ranking_col, sort_order = flags
+    columns_to_select = ", ".join("c.name AS Sub_Category" if col == 'Sub_Category' else f"mf.{col}" for col in DISPLAY_COLUMNS)
+    where = [" WHERE mf.Date_Loaded = ? "]
+    for active, fragment in ((has_category, f" AND mf.Sub_Category_Id = (SELECT id FROM {category_table_name} WHERE name = ?) "),
+                             (has_min_aum, " AND mf.AUM >= ? "), (has_max_aum, " AND mf.AUM <= ? "),
+                             (has_min_exp, " AND mf.Expense_Ratio >= ? "), (has_max_exp, " AND mf.Expense_Ratio <= ? ")):
+        if active: where.append(fragment)
+    query = "".join([f" SELECT {columns_to_select} FROM {table_name} mf LEFT JOIN {category_table_name} c ON c.id = mf.Sub_Category_Id ",
+                     *where, f" ORDER BY mf.{ranking_col} {sort_order} LIMIT 100 "]) # Limit results
+    return query
 
 # --- MODIFIED: Display Data - Now with MORE Filters ---
 def display_ranked_data():
@@ -181,18 +617,9 @@ def display_ranked_data():
     selected_ranking_key = ranking_criteria_var.get()
 
     # --- Get Filter Values ---
-    try: # Use try-except for number conversions
-        min_aum_str = min_aum_var.get()
-        min_aum = float(min_aum_str) if min_aum_str else None
-
-        max_aum_str = max_aum_var.get()
-        max_aum = float(max_aum_str) if max_aum_str else None
-
-        min_exp_str = min_exp_var.get()
-        min_exp = float(min_exp_str) if min_exp_str else None
-
-        max_exp_str = max_exp_var.get()
-        max_exp = float(max_exp_str) if max_exp_str else None
+    try: # One try-except for all four number conversions
+        min_aum, max_aum = _parse_float_or_none(min_aum_var), _parse_float_or_none(max_aum_var)
+        min_exp, max_exp = _parse_float_or_none(min_exp_var), _parse_float_or_none(max_exp_var)
     except ValueError:
         messagebox.showerror("Input Error", "Invalid number entered in AUM or Expense Ratio filters.")
         return
@@ -201,83 +628,145 @@ def display_ranked_data():
         messagebox.showwarning("Input Needed", "Please select a ranking criterion."); return
 
     ranking_col, sort_order = RANKING_OPTIONS[selected_ranking_key]
+    latest_timestamp = get_latest_timestamp()
+    if latest_timestamp is None:
+        clear_treeview(); status_update("No data in DB yet. Load an Excel file first."); return
     status_update(f"Querying data: Cat='{selected_category}', Rank='{selected_ranking_key}', AUM=({min_aum}-{max_aum}), Exp=({min_exp}-{max_exp})")
 
-    # --- Build Query Dynamically ---
-    columns_to_select = f"Name, Sub_Category, AUM, NAV, Expense_Ratio, CAGR_3Y, CAGR_5Y, Absolute_Returns_1Y, Sharpe_Ratio, Alpha, Date_Loaded"
-    base_query = f""" SELECT {columns_to_select} FROM {table_name}
-                      WHERE Date_Loaded = (SELECT MAX(Date_Loaded) FROM {table_name}) """
-    params = [] # Parameters for SQL query
-
-    # Add filters dynamically
-    if selected_category and selected_category != "All Categories":
-        base_query += " AND Sub_Category = ? "
-        params.append(selected_category)
-    if min_aum is not None:
-        base_query += " AND AUM >= ? "
-        params.append(min_aum)
-    if max_aum is not None:
-        base_query += " AND AUM <= ? "
-        params.append(max_aum)
-    if min_exp is not None:
-        base_query += " AND Expense_Ratio >= ? "
-        params.append(min_exp)
-    if max_exp is not None:
-        base_query += " AND Expense_Ratio <= ? "
-        params.append(max_exp)
-
-    base_query += f" ORDER BY {ranking_col} {sort_order} LIMIT 100 " # Limit results
-
-    # --- Execute Query ---
-    df_filtered_ranked = query_data_from_sqlite(db_path=db_file_path, query=base_query, params=params if params else None)
-
-    # --- Update Treeview ---
+    # --- Build Query (one cached SQL string per filter shape; values always go in params) ---
+    has_category = bool(selected_category and selected_category != "All Categories")
+    flags = (has_category, min_aum is not None, max_aum is not None, min_exp is not None, max_exp is not None, ranking_col, sort_order)
+    base_query = _build_query(flags)
+    params = [latest_timestamp] # Parameters for SQL query, in the order of the placeholders
+    if has_category: params.append(selected_category)
+    params.extend(value for value in (min_aum, max_aum, min_exp, max_exp) if value is not None)
+
+    # --- Execute Query (off the Tk thread; the first page is shown while the rest is still being fetched) ---
     clear_treeview()
-    if df_filtered_ranked is not None:
-        if not df_filtered_ranked.empty:
-            tree["columns"] = list(df_filtered_ranked.columns)
-            tree["show"] = "headings"
-            for col in df_filtered_ranked.columns:
-                heading_text = col.replace('_', ' ')
-                tree.heading(col, text=heading_text)
-                width = 100; anchor = 'center' # Defaults
-                if "Name" in col: width=250; anchor='w'
-                elif "Category" in col: width=150; anchor='w'
-                elif "Date" in col: width=130; anchor='center'
-                elif "AUM" in col or "NAV" in col: width=100; anchor='e'
-                elif "Ratio" in col or "CAGR" in col or "Return" in col or "Alpha" in col: width=80; anchor='e'
-                tree.column(col, width=width, anchor=anchor)
-            for index, row in df_filtered_ranked.iterrows():
-                tree.insert("", tk.END, values=tuple(str(v) if pd.notna(v) else "" for v in row))
-            status_update(f"Displayed {len(df_filtered_ranked)} funds matching filters, ranked by '{selected_ranking_key}'.")
-        else:
-             status_update(f"No data found matching filters.")
-    else:
-        status_update("Failed to retrieve filtered/ranked data.")
+    _executor.submit(_ranked_query_worker, base_query, params, selected_ranking_key, _tree_generation)
+
+def _ranked_query_worker(query, params, ranking_key, generation):
+    """ Streams the ranking query's rows to the Tk thread in TREE_PAGE_SIZE chunks. """
+    if not os.path.exists(db_file_path):
+        status_update("Error: Database file not found."); return
+    total = 0
+    try:
+        for rows in iter_query_rows(db_file_path, query, params, TREE_PAGE_SIZE):
+            total += len(rows)
+            run_on_ui(_add_tree_rows, generation, rows)
+    except Exception as e:
+        print(f"Error querying DB: {e}")
+        status_update(f"Failed to retrieve filtered/ranked data: {e}"); return
+    if total: status_update(f"Displayed {total} funds matching filters, ranked by '{ranking_key}'.")
+    else: status_update("No data found matching filters.")
 
 
+def _init_tree_columns():
+    """ Configures the Treeview's columns, headings, widths and anchors once at startup. """
+    tree["columns"] = DISPLAY_COLUMNS
+    tree["show"] = "headings"
+    for col in DISPLAY_COLUMNS:
+        width, anchor, heading_text = COLUMN_STYLE.get(col) or (100, 'center', col.replace('_', ' '))
+        tree.heading(col, text=heading_text)
+        tree.column(col, width=width, anchor=anchor)
+
 def clear_treeview():
+     global _tree_generation
+     _tree_generation += 1 # Rows still in flight from an earlier query are dropped
+     _tree_pending.clear()
      try: tree.delete(*tree.get_children())
      except Exception as e: print(f"Error clearing treeview: {e}")
 
+# --- Lazy Treeview paging: rows are inserted TREE_PAGE_SIZE at a time as the view nears the bottom ---
+_tree_pending = [] # Rows of the current result not yet inserted into the Treeview
+_tree_generation = 0 # Bumped by clear_treeview; tags which query's rows belong in the tree
+
+def _insert_tree_rows(rows):
+    """ Appends rows to the Treeview in one pass with layout and selection suspended. """
+    # Hide columns and disable selection during the bulk insert so rows aren't laid out one by one
+    select_mode = tree.cget('selectmode')
+    tree.configure(displaycolumns=(), selectmode='none')
+    try:
+        tk_call, tree_path = tree.tk.call, tree._w # Raw Tcl insert skips ttk's per-call option formatting
+        for row in rows:
+            tk_call(tree_path, 'insert', '', 'end', '-values', ["" if v is None else v for v in row]) # NULL -> blank cell
+    finally:
+        tree.configure(displaycolumns='#all', selectmode=select_mode)
+
+def _add_tree_rows(generation, rows):
+    """ Tk-thread sink for _ranked_query_worker: queues rows, showing them at once if the bottom of the list is in view. """
+    if generation != _tree_generation: return # Result of an older query; the tree has been cleared since
+    _tree_pending.extend(rows)
+    if tree.yview()[1] >= 0.9: _insert_next_tree_page()
+
+def _insert_next_tree_page():
+    """ Moves the next TREE_PAGE_SIZE pending rows into the Treeview. """
+    page = _tree_pending[:TREE_PAGE_SIZE]
+    del _tree_pending[:TREE_PAGE_SIZE]
+    if page: _insert_tree_rows(page)
+
+def _on_tree_yscroll(first, last):
+    """ Treeview yscrollcommand: updates the scrollbar and loads the next page once the bottom 10% is in view. """
+    vsb.set(first, last)
+    if _tree_pending and float(last) >= 0.9:
+        tree.after_idle(_insert_next_tree_page) # Not from inside the scroll callback itself
+
+_status_pending = collections.deque(maxlen=1) # Newest status message not yet shown; older ones are coalesced away
+
 def status_update(message):
-    try: status_var.set(message)
-    except Exception as e: print(f"Error updating status bar: {e}")
-    print(message)
+    """ Queues message for the status bar (safe from any thread) and logs it. """
+    _status_pending.append(message)
+    log.info(message)
+
+def _flush_status():
+    """ Shows the newest queued status message, then re-arms itself on the Tk event loop. """
+    try: message = _status_pending.pop()
+    except IndexError: pass
+    else:
+        try: status_var.set(message)
+        except Exception as e: print(f"Error updating status bar: {e}")
+    root.after(STATUS_FLUSH_MS, _flush_status)
+
+def on_app_close():
+    """ Cancels queued background work and tears down the window. A running load finishes before the interpreter exits;
+        the atexit hook then closes the DB connections (after the executor's threads are joined). """
+    _executor.shutdown(wait=False, cancel_futures=True)
+    root.destroy()
+
+_category_cache = (None, []) # (latest_ts, categories) of the list currently known to be valid
 
 def populate_category_filter():
+    """ Fills the category dropdown: from memory or the sidecar cache if they match the latest load, else via a worker. """
+    global _category_cache
     status_update("Populating category filter...")
-    query = f""" SELECT DISTINCT Sub_Category FROM {table_name}
-                 WHERE Date_Loaded = (SELECT MAX(Date_Loaded) FROM {table_name}) ORDER BY Sub_Category """
-    df_categories = query_data_from_sqlite(db_path=db_file_path, query=query)
-    category_list = ["All Categories"]
-    if df_categories is not None and not df_categories.empty:
-        category_list.extend(df_categories['Sub_Category'].tolist())
-        status_update(f"Found {len(category_list)-1} categories.")
+    latest_timestamp = get_latest_timestamp()
+    if latest_timestamp is None:
+        _set_category_values([]); return
+    if _category_cache[0] == latest_timestamp:
+        _set_category_values(_category_cache[1], source="memory"); return
+    cached = _load_sidecar().get('categories')
+    if cached and cached.get('latest_ts') == latest_timestamp:
+        _category_cache = (latest_timestamp, cached['values'])
+        _set_category_values(cached['values'], source="cache"); return
+    _executor.submit(_category_worker, latest_timestamp)
+
+def _category_worker(latest_timestamp):
+    """ Queries the distinct categories of the given load off the Tk thread and caches them in memory + the sidecar. """
+    global _category_cache
+    df_categories = query_data_from_sqlite(db_path=db_file_path, query=_CATEGORIES_SQL, params=(latest_timestamp,))
+    if df_categories is None: return # Error already reported by query_data_from_sqlite
+    categories = df_categories['Sub_Category'].tolist()
+    _category_cache = (latest_timestamp, categories)
+    _save_sidecar('categories', {'latest_ts': latest_timestamp, 'values': categories})
+    run_on_ui(_set_category_values, categories)
+
+def _set_category_values(categories, source="DB"):
+    category_list = ["All Categories"] + list(categories)
+    if categories: status_update(f"Found {len(categories)} categories ({source}).")
     else: status_update("No categories found in DB yet.")
     try:
         category_filter_combobox['values'] = category_list
-        if category_list: category_filter_var.set(category_list[0])
+        category_filter_var.set(category_list[0])
     except Exception as e: print(f"Error populating combobox: {e}")
 
 
@@ -364,7 +853,8 @@ if __name__ == "__main__":
     tree = ttk.Treeview(tree_frame)
     vsb = ttk.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
     hsb = ttk.Scrollbar(tree_frame, orient="horizontal", command=tree.xview)
-    tree.configure(yscrollcommand=vsb.set, xscrollcommand=hsb.set)
+    tree.configure(yscrollcommand=_on_tree_yscroll, xscrollcommand=hsb.set)
+    _init_tree_columns()
     tree.grid(row=0, column=0, sticky='nsew')
     vsb.grid(row=0, column=1, sticky='ns')
     hsb.grid(row=1, column=0, sticky='ew')
@@ -375,7 +865,17 @@ if __name__ == "__main__":
     status_bar = ttk.Label(root, textvariable=status_var, relief=tk.SUNKEN, anchor=tk.W, padding="2 5")
     status_bar.pack(side=tk.BOTTOM, fill=tk.X)
 
+    root.protocol("WM_DELETE_WINDOW", on_app_close)
+    root.after(50, _process_ui_queue) # Start pumping callbacks from the load worker
+    root.after(STATUS_FLUSH_MS, _flush_status) # Start repainting the status bar
+
+    # --- Logging (file only, so status updates never block on terminal I/O) ---
+    log_handler = logging.handlers.RotatingFileHandler(log_file_path, maxBytes=1_000_000, backupCount=3, encoding='utf-8')
+    log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    log.addHandler(log_handler); log.setLevel(logging.INFO)
+
     # --- Initial Population ---
+    init_db(db_file_path) # WAL + tuned PRAGMAs are applied once here and persist for the session
     root.after(100, populate_category_filter) # Populate dropdown after window loads
 
     # --- Run ---